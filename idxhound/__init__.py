@@ -1,6 +1,8 @@
 import bidict
 from collections import abc
+import itertools as it
 import numpy as np
+import operator
 
 
 class Selection(bidict.FrozenOrderedBidict):
@@ -14,15 +16,19 @@ class Selection(bidict.FrozenOrderedBidict):
     mapping : bool
         Whether the first argument is a mapping (primarily for internal use).
     """
+    __slots__ = ('_array', '_sorted_items', '_values')
+
     def __init__(self, obj, *, mapping=False, **kwargs):
         if not mapping:
-            obj = np.asarray(obj)
-            self._array = obj
+            # Copy so the cached arrays cannot drift from the mapping if the caller modifies `obj`
+            obj = _readonly(np.array(obj))
             if obj.ndim != 1:
                 raise ValueError("selection object must be one-dimensional")
             if obj.dtype == bool:
-                obj, = np.nonzero(obj)
-            obj = [(i, j) for j, i in enumerate(obj)]
+                obj = _readonly(np.flatnonzero(obj))
+            self._array = obj
+            self._values = _readonly(np.arange(len(obj)))
+            obj = zip(_tolist(obj), range(len(obj)))
 
         super(Selection, self).__init__(obj, **kwargs)
 
@@ -30,13 +36,34 @@ class Selection(bidict.FrozenOrderedBidict):
         """
         Allows the index to act as a numpy array [1], e.g. for indexing.
 
+        .. note::
+
+           Selections constructed from a boolean mask act as the integer indices of the non-zero
+           elements.
+
         References
         ----------
         .. [1] Writing custom array containers.
            https://numpy.org/doc/stable/user/basics.dispatch.html
         """
-        if not hasattr(self, '_array') or self._array is None:
-            self._array = np.fromiter(self, int)
+        if getattr(self, '_array', None) is None:
+            # The keys of this selection are the values of its inverse
+            array = getattr(self.inverse, '_values', None)
+            if array is None or len(array) != len(self):
+                keys = list(self)
+                try:
+                    array = np.asarray(keys)
+                    is_integer = array.ndim == 1 and array.dtype.kind in 'iu'
+                except ValueError:  # Keys are sequences of different lengths
+                    is_integer = False
+                # Use an object array if numpy would coerce or broadcast keys
+                if not is_integer:
+                    array = np.empty(len(keys), object)
+                    for i, key in enumerate(keys):
+                        array[i] = key
+                # Prevent callers from modifying the cache
+                array = _readonly(array)
+            self._array = array
         return self._array
 
     def __matmul__(self, other):
@@ -44,9 +71,69 @@ class Selection(bidict.FrozenOrderedBidict):
 
     def __getitem__(self, key):
         if isinstance(key, abc.Collection) and not isinstance(key, (str, bytes, bytearray)):
-            return [self[x] for x in key]
+            if self._get_sorted_items() is not None:
+                try:
+                    array = np.asarray(key)
+                except ValueError:  # Nested keys of different lengths
+                    array = None
+                if array is not None and array.ndim == 1 and array.dtype.kind in 'iu':
+                    return _tolist(self._lookup(array))
+            # Look up each element recursively to support nested keys
+            return list(map(self.__getitem__, key))
         return super(Selection, self).__getitem__(key)
 
+    def _get_sorted_items(self):
+        """
+        Lazily evaluate the integer keys of the selection in sorted order together with their
+        values, or `None` if keys are not integers.
+        """
+        sorted_items = getattr(self, '_sorted_items', False)
+        if sorted_items is False:
+            keys = np.asarray(self)
+            values = self._get_values()
+            # Lengths differ if duplicate keys were collapsed when the selection was constructed
+            if keys.dtype.kind in 'iu' and len(keys) == len(values) == len(self):
+                # Keys are already sorted for boolean masks and the inverse of most selections
+                if not np.all(keys[1:] > keys[:-1]):
+                    sorter = np.argsort(keys)
+                    keys = keys[sorter]
+                    values = values[sorter]
+                # Store the index with a native integer type so lookups do not need to cast it
+                sorted_items = tuple(
+                    x.astype(np.intp, copy=False) if np.can_cast(x.dtype, np.intp) else x
+                    for x in [keys, values]
+                )
+            else:
+                sorted_items = None
+            self._sorted_items = sorted_items
+        return sorted_items
+
+    def _get_values(self):
+        """
+        Evaluate the values of the selection as an array.
+        """
+        values = getattr(self, '_values', None)
+        # The values of this selection are the keys of its inverse
+        return np.asarray(self.inverse) if values is None else values
+
+    def _lookup(self, keys):
+        """
+        Look up the values for an array of integer keys.
+        """
+        sorted_keys, sorted_values = self._get_sorted_items()
+        keys = np.asarray(keys)
+        if np.can_cast(keys.dtype, sorted_keys.dtype):
+            keys = np.ascontiguousarray(keys, sorted_keys.dtype)
+        if not sorted_keys.size:
+            if keys.size:
+                raise KeyError(keys[0].item())
+            return sorted_values[:0]
+        idx = np.minimum(np.searchsorted(sorted_keys, keys), sorted_keys.size - 1)
+        missing = sorted_keys[idx] != keys
+        if missing.any():
+            raise KeyError(keys[missing][0].item())
+        return sorted_values[idx]
+
     def compose(self, other):
         """
         Evaluate the composite selection equivalent to applying this selection followed by another.
@@ -67,10 +154,22 @@ class Selection(bidict.FrozenOrderedBidict):
         """
         if not isinstance(other, Selection):
             other = Selection(other)
-        return self.__class__(
-            [(self.inverse[key], value) for key, value in other.items()],
-            mapping=True,
-        )
+        # Short-circuit composition with empty or identity selections
+        n = len(other)
+        if not n:
+            return self._from_arrays(np.empty(0, np.intp), np.empty(0, np.intp))
+        if n == len(self):
+            identity = np.arange(n)
+            arrays = [np.asarray(other), other._get_values(), self._get_values()]
+            if all(np.array_equal(array, identity) for array in arrays):
+                return self
+        inverse = self.inverse
+        # Gather the keys in one go if the inverse and the other selection have integer keys
+        if inverse._get_sorted_items() is not None and other._get_sorted_items() is not None:
+            return self._from_arrays(inverse._lookup(np.asarray(other)), other._get_values())
+        # Bind the lookup once, bypassing the collection check in `Selection.__getitem__`
+        lookup = super(Selection, inverse).__getitem__
+        return self.__class__([(lookup(key), value) for key, value in other.items()], mapping=True)
 
     @classmethod
     def from_iterable(cls, keys):
@@ -98,7 +197,19 @@ class Selection(bidict.FrozenOrderedBidict):
         >>> idxhound.Selection.from_iterable('abc')
         Selection([('a', 0), ('b', 1), ('c', 2)])
         """
-        return cls([(x, i) for i, x in enumerate(keys)], mapping=True)
+        # Build the mapping in C rather than creating a tuple for each key
+        return cls(dict(zip(keys, it.count())), mapping=True)
+
+    @classmethod
+    def _from_arrays(cls, keys, values):
+        """
+        Create a selection object from parallel arrays of keys and values.
+        """
+        obj = cls(zip(_tolist(keys), _tolist(values)), mapping=True)
+        # Keep the arrays so the selection does not have to be iterated for vectorized operations
+        obj._array = _readonly(keys)
+        obj._values = _readonly(values)
+        return obj
 
     def array_to_dict(self, x, *args, **kwargs):
         """
@@ -135,6 +246,26 @@ class Selection(bidict.FrozenOrderedBidict):
         return dict_to_array(d, self, *args, **kwargs)
 
 
+def _tolist(array):
+    """
+    Convert an array to a list, using python scalars in one go rather than boxing each element
+    individually if they are equivalent to the numpy scalars.
+    """
+    # Python scalars of other types differ from numpy scalars, e.g. `datetime64` becomes `date`
+    if array.dtype.kind in 'iufcSU':
+        return array.tolist()
+    return list(array)
+
+
+def _readonly(array):
+    """
+    Obtain a read-only view of an array.
+    """
+    array = array.view()
+    array.setflags(write=False)
+    return array
+
+
 def array_to_dict(x, *objects, squeeze=True):
     """
     Convert an array to a dictionary of key-value pairs.
@@ -164,15 +295,13 @@ def array_to_dict(x, *objects, squeeze=True):
     x = np.asarray(x)
     if x.ndim != len(objects):
         raise ValueError('dimension of `x` and `objects` must match')
-    # Get indices with shape `(ndim, prod(shape))`
-    idx = np.reshape(np.indices(x.shape), (x.ndim, -1))
-    # Map to the original space and transpose if necessary
-    idx = [obj.inverse[i] for i, obj in zip(idx, objects)]
+    # Map the indices along each axis to the original space and take the product if necessary
+    idx = [obj.inverse[range(size)] for size, obj in zip(x.shape, objects)]
     if x.ndim == 1 and squeeze:
         idx, = idx
     else:
-        idx = zip(*idx)
-    return dict(zip(idx, x.ravel()))
+        idx = it.product(*idx)
+    return dict(zip(idx, _tolist(x.ravel())))
 
 
 def dict_to_array(d, *objects, fill_value=np.nan, dtype=None, squeezed=True,
@@ -211,29 +340,42 @@ def dict_to_array(d, *objects, fill_value=np.nan, dtype=None, squeezed=True,
     array([2.873, 3.769,   nan, 8.982])
     """
     # Create an array
-    shape = tuple(max(obj.values()) + 1 for obj in objects)
-    x = np.empty(shape, dtype)
-    x[...] = fill_value
+    shape = []
+    for obj in objects:
+        values = obj._get_values()
+        # Values may skip positions if duplicate keys were collapsed, e.g. `from_iterable('aba')`
+        if values.dtype.kind in 'iu' and len(values) == len(obj):
+            shape.append(int(values.max()) + 1)
+        else:
+            shape.append(max(obj.values()) + 1)
+    if dtype is None:
+        dtype = float
+    # Zeros can be obtained from the allocator without writing to the array
+    if np.ndim(fill_value) == 0 and fill_value == 0:
+        x = np.zeros(shape, dtype)
+    else:
+        x = np.full(shape, fill_value, dtype)
 
-    # Transpose and map into the integer space
+    # Split the keys by axis
+    keys = list(d)
+    values = list(d.values())
     if squeezed and x.ndim == 1:
-        obj, = objects
-        selector = lambda i: obj[i]  # noqa: E731
+        columns = [keys]
     else:
-        selector = lambda i: [obj[j] for j, obj in zip(i, objects)]  # noqa: E731
-
-    idx = []
-    values = []
-    for i, y in d.items():
-        try:
-            idx.append(selector(i))
-            values.append(y)
-        except KeyError:
-            if not ignore_missing_keys:
-                raise
-
-    # Assign the values
-    if not squeezed or x.ndim != 1:
-        idx = tuple(zip(*idx))
+        columns = [list(map(operator.itemgetter(axis), keys)) for axis in range(x.ndim)]
+
+    # Drop keys that are not present in the selections
+    if ignore_missing_keys:
+        present = np.ones(len(keys), bool)
+        for column, obj in zip(columns, objects):
+            present &= np.fromiter(map(obj.__contains__, column), bool, count=len(keys))
+        if not present.all():
+            columns = [list(it.compress(column, present)) for column in columns]
+            values = list(it.compress(values, present))
+
+    # Map into the integer space and assign the values
+    idx = tuple(obj[column] for column, obj in zip(columns, objects))
+    if not x.dtype.hasobject:
+        values = np.fromiter(values, x.dtype, count=len(values))
     x[idx] = values
     return x
@@ -1,6 +1,7 @@
 import idxhound
 import itertools as it
 import numpy as np
+import pickle
 import pytest
 
 
@@ -27,6 +28,11 @@ def test_composition():
         assert index[x] == y
 
 
+def test_composition_non_integer_keys():
+    index = idxhound.Selection.from_iterable('abc').inverse @ idxhound.Selection(['c', 'a'])
+    assert list(index.items()) == [(2, 0), (0, 1)]
+
+
 def test_boolean():
     x = np.random.normal(0, 1, 100)
     fltr = x > np.median(x)
@@ -45,6 +51,22 @@ def test_integer():
         assert x[i] == fltrd[j]
 
 
+def test_datetime():
+    dates = np.arange('2020-01-01', '2020-01-04', dtype='datetime64[D]')
+    index = idxhound.Selection(dates)
+    assert index[dates[1]] == 1
+    assert index.inverse[2] == dates[2]
+    assert index.inverse[[0, 1]] == list(dates[:2])
+    assert list(index @ idxhound.Selection([2, 0])) == [dates[2], dates[0]]
+
+
+def test_array_to_dict_datetime_values():
+    x = np.array(['2020-01-01', '2020-01-02'], dtype='datetime64[ns]')
+    d = idxhound.array_to_dict(x, idxhound.Selection.from_iterable('ab'))
+    assert d == {'a': x[0], 'b': x[1]}
+    assert isinstance(d['a'], np.datetime64)
+
+
 def test_indexing():
     x = np.random.normal(0, 1, 100)
     fltr = x > np.median(x)
@@ -52,6 +74,13 @@ def test_indexing():
     np.testing.assert_array_equal(x[fltr], x[index])
 
 
+def test_boolean_array():
+    fltr = np.random.normal(0, 1, 100) > 0
+    array = np.asarray(idxhound.Selection(fltr))
+    np.testing.assert_array_equal(array, np.flatnonzero(fltr))
+    assert not array.flags.writeable
+
+
 def test_two_filters():
     x = np.random.normal(0, 1, 10)
 
@@ -85,11 +114,101 @@ def test_multiple_filters():
     np.testing.assert_array_equal(y, x[index])
 
 
+def test_integer_composition():
+    x = np.random.normal(0, 1, 100)
+    idx1 = idxhound.Selection(np.random.permutation(100)[:50])
+    idx2 = idxhound.Selection(np.random.permutation(50)[:20])
+    index = idx1 @ idx2
+    np.testing.assert_array_equal(x[idx1][idx2], x[index])
+    assert list(index.values()) == list(range(20))
+
+
+def test_composition_inverse():
+    fltr = np.random.permutation(100)[:50]
+    idx1 = idxhound.Selection(np.random.permutation(100))
+    idx2 = idxhound.Selection(fltr)
+    index = idx1 @ idx2.inverse
+    assert dict(index) == {idx1.inverse[key]: value for key, value in idx2.inverse.items()}
+    # The cache must be decoupled from the array passed to the constructor
+    assert fltr.flags.writeable
+    assert not np.asarray(index).flags.writeable
+    assert not np.asarray(idx2).flags.writeable
+    key = fltr[0]
+    fltr[0] = 100
+    assert idx2[[key]] == [idx2[key]] == [0]
+    with pytest.raises(KeyError):
+        idx2[[100]]
+    assert np.asarray(idx2)[0] == key
+
+
+def test_duplicate_keys():
+    index = idxhound.Selection([1, 1])
+    assert index[[1]] == [1]
+    assert index.inverse[[1]] == [1]
+
+
+def test_identity_composition():
+    x = np.random.normal(0, 1, 100)
+    index = idxhound.Selection(x > 0)
+    assert index @ np.ones(len(index), bool) is index
+    assert index @ np.arange(len(index)) is index
+    empty = index @ np.zeros(len(index), bool)
+    assert len(empty) == 0
+    assert x[empty].shape == (0,)
+
+
+def test_pickle():
+    x = np.random.normal(0, 1, 100)
+    index = idxhound.Selection(x > 0) @ np.random.permutation(20)
+    assert index[list(index)[:2]] == list(index.values())[:2]
+    other = pickle.loads(pickle.dumps(index))
+    assert other == index
+    assert other.inverse == index.inverse
+    np.testing.assert_array_equal(x[other], x[index])
+
+
 def test_multiindex():
     index = idxhound.Selection.from_iterable('abc')
     assert index[['a', 'c']] == [0, 2]
 
 
+@pytest.mark.parametrize('key', [[7, 3], np.asarray([3, 7, 3]), []])
+def test_integer_multiindex(key):
+    index = idxhound.Selection([5, 7, 3])
+    assert index[key] == [index[x] for x in key]
+    assert index.inverse[index[key]] == list(key)
+
+
+def test_integer_multiindex_dtype():
+    index = idxhound.Selection(np.asarray([5, 7, 3], dtype=np.int16))
+    assert index[np.asarray([3, 5], dtype=np.int64)] == [2, 0]
+    assert index[np.asarray([3, 5], dtype=np.uint8)] == [2, 0]
+
+
+@pytest.mark.parametrize('fltr', [[5, 7, 3], np.asarray([], int)])
+def test_integer_multiindex_missing_key(fltr):
+    index = idxhound.Selection(fltr)
+    with pytest.raises(KeyError):
+        index[[3, 4]]
+
+
+def test_empty_integer_multiindex():
+    index = idxhound.Selection(np.asarray([], int))
+    with pytest.raises(KeyError):
+        index[[1]]
+    assert index[np.asarray([], int)] == []
+
+
+@pytest.mark.parametrize('index, key, expected', [
+    (idxhound.Selection([5, 7, 3]), [[5, 7], [3]], [[0, 1], [2]]),
+    (idxhound.Selection([5, 7, 3]), [[5, 7], [3, 5]], [[0, 1], [2, 0]]),
+    (idxhound.Selection.from_iterable('abc'), [['a', 'b'], ['c']], [[0, 1], [2]]),
+    (idxhound.Selection.from_iterable('abc'), [['a', 'b'], ['c', 'a']], [[0, 1], [2, 0]]),
+])
+def test_nested_multiindex(index, key, expected):
+    assert index[key] == expected
+
+
 def test_wrong_ndim():
     with pytest.raises(ValueError):
         idxhound.Selection(np.random.normal(size=(2, 2)))
@@ -139,6 +258,37 @@ def test_dict_to_array():
     ])
 
 
+def test_array_to_dict_mixed_keys():
+    keys = [3, 'a', (1, 2)]
+    obj = idxhound.Selection.from_iterable(keys)
+    x = np.random.normal(size=3)
+    d = idxhound.array_to_dict(x, obj)
+    assert list(d) == keys
+    assert list(obj @ idxhound.Selection([2, 0])) == [(1, 2), 3]
+
+
+def test_dict_to_array_array_fill_value():
+    obj1 = idxhound.Selection.from_iterable('ab')
+    obj2 = idxhound.Selection.from_iterable('xy')
+    x = idxhound.dict_to_array({('a', 'y'): 3}, obj1, obj2, fill_value=np.asarray([7., 8.]))
+    np.testing.assert_array_equal(x, [[7, 3], [7, 8]])
+
+
+def test_dict_to_array_integer_keys():
+    obj = idxhound.Selection([5, 2, 9])
+    x = idxhound.dict_to_array({9: 1, 5: 2}, obj, dtype=int, fill_value=0)
+    np.testing.assert_array_equal(x, [2, 0, 1])
+
+
+@pytest.mark.parametrize('index, expected', [
+    (idxhound.Selection.from_iterable('aba'), [np.nan, np.nan, 1]),
+    (idxhound.Selection(['a', 'a']), [np.nan, 1]),
+])
+def test_dict_to_array_duplicate_keys(index, expected):
+    x = idxhound.dict_to_array({'a': 1.0}, index)
+    np.testing.assert_array_equal(x, expected)
+
+
 @pytest.mark.parametrize('shape', [
     (4,),
     (3, 8),